@@ -8,11 +8,13 @@ so the creation of those is managed here.
 from collections import defaultdict
 from datetime import date
 from decimal import Decimal
-from typing import DefaultDict, Dict, List, Optional, Sequence, Tuple
+from typing import Callable, DefaultDict, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 from django.db import transaction
 from django.db.models import Count, Sum
+from django.dispatch import Signal
+from django.utils import timezone
 from moneyed import Money
 from structlog import get_logger
 
@@ -265,13 +267,14 @@ def mark_account_as_delinquent(account_id: UUID, reason: str):
     account = Account.objects.get(id=account_id)
     if not account.delinquent:
         logger.info('mark-account-as-delinquent', account_id=account_id, reason=reason)
-        account.delinquent = True
-        account.save()
-        EventLog.objects.create(
-            account_id=account_id,
-            type=EventLog.NEW_DELINQUENT,
-            text=reason,
-        )
+        with transaction.atomic():
+            account.delinquent = True
+            account.save()
+            EventLog.objects.create(
+                account_id=account_id,
+                type=EventLog.NEW_DELINQUENT,
+                text=reason,
+            )
         new_delinquent_account.send(sender=mark_account_as_delinquent, account=account)
 
 
@@ -279,25 +282,86 @@ def mark_account_as_compliant(account_id: UUID, reason: str):
     account = Account.objects.get(id=account_id)
     if account.delinquent:
         logger.info('mark-account-as-compliant', account_id=account_id, reason=reason)
-        account.delinquent = False
-        account.save()
-        EventLog.objects.create(
-            account_id=account_id,
-            type=EventLog.NEW_COMPLIANT,
-            text=reason,
-        )
+        with transaction.atomic():
+            account.delinquent = False
+            account.save()
+            EventLog.objects.create(
+                account_id=account_id,
+                type=EventLog.NEW_COMPLIANT,
+                text=reason,
+            )
         new_compliant_account.send(sender=mark_account_as_compliant, account=account)
 
 
+def mark_accounts_as_delinquent(reason_by_account_id: Dict[UUID, str]) -> int:
+    """
+    Marks several accounts as delinquent, writing all the event logs at once.
+    Accounts that are already delinquent are left untouched.
+
+    :param reason_by_account_id: The reason to record for each account.
+    :return: The number of accounts that were marked as delinquent.
+    """
+    return _mark_accounts(reason_by_account_id,
+                          delinquent=True,
+                          event_type=EventLog.NEW_DELINQUENT,
+                          signal=new_delinquent_account,
+                          sender=mark_account_as_delinquent)
+
+
+def mark_accounts_as_compliant(reason_by_account_id: Dict[UUID, str]) -> int:
+    """
+    Marks several accounts as compliant, writing all the event logs at once.
+    Accounts that are already compliant are left untouched.
+
+    :param reason_by_account_id: The reason to record for each account.
+    :return: The number of accounts that were marked as compliant.
+    """
+    return _mark_accounts(reason_by_account_id,
+                          delinquent=False,
+                          event_type=EventLog.NEW_COMPLIANT,
+                          signal=new_compliant_account,
+                          sender=mark_account_as_compliant)
+
+
+def _mark_accounts(reason_by_account_id: Dict[UUID, str],
+                   delinquent: bool,
+                   event_type: str,
+                   signal: Signal,
+                   sender: Callable) -> int:
+    if not reason_by_account_id:
+        return 0
+
+    accounts = list(Account.objects.filter(id__in=reason_by_account_id.keys()).exclude(delinquent=delinquent))
+    logger.info('mark-accounts', delinquent=delinquent, account_count=len(accounts))
+    if not accounts:
+        return 0
+
+    with transaction.atomic():
+        Account.objects \
+            .filter(id__in=[account.id for account in accounts]) \
+            .update(delinquent=delinquent, modified=timezone.now())
+        EventLog.objects.bulk_create([
+            EventLog(account_id=account.id, type=event_type, text=reason_by_account_id[account.id])
+            for account in accounts
+        ])
+
+    for account in accounts:
+        account.delinquent = delinquent
+        # Same sender as the single-account actions, so that receivers don't need to know about the bulk path.
+        signal.send(sender=sender, account=account)
+    return len(accounts)
+
+
 def charge_pending_invoices(account_id: UUID) -> Dict[str, int]:
     account = Account.objects.get(id=account_id)
-    pending_invoices = account.invoices.payable().only('pk')
-    logger.info('charge-pending-invoices', pending_invoices=pending_invoices)
+    pending_invoice_ids = list(account.invoices.payable().values_list('pk', flat=True))
+    logger.info('charge-pending-invoices', account_id=account_id, pending_invoice_count=len(pending_invoice_ids))
+    logger.debug('charge-pending-invoices.detail', account_id=account_id, pending_invoice_ids=pending_invoice_ids)
 
     payment_transactions = []
-    for invoice in pending_invoices:
+    for invoice_id in pending_invoice_ids:
         try:
-            payment_transaction = invoices.pay_with_account_credit_cards(invoice.pk)
+            payment_transaction = invoices.pay_with_account_credit_cards(invoice_id)
             if payment_transaction:
                 payment_transactions.append(payment_transaction)
         except PreconditionError:
@@ -310,7 +374,7 @@ def charge_pending_invoices(account_id: UUID) -> Dict[str, int]:
     num_paid_invoices = len(payment_transactions)
     return {
         'num_paid_invoices': num_paid_invoices,
-        'num_failed_invoices': len(pending_invoices) - num_paid_invoices
+        'num_failed_invoices': len(pending_invoice_ids) - num_paid_invoices
     }
 
 
@@ -5,8 +5,8 @@ from django.core.management.base import BaseCommand
 from ...actions.accounts import (
     get_accounts_which_delinquent_status_has_to_change,
     get_reasons_account_is_violating_delinquent_criteria,
-    mark_account_as_compliant,
-    mark_account_as_delinquent,
+    mark_accounts_as_compliant,
+    mark_accounts_as_delinquent,
 )
 from ...models import Account
 
@@ -28,7 +28,7 @@ class Command(BaseCommand):
         parser.add_argument(
             '--progress',
             action='store_true',
-            help='Displays a progress bar'
+            help='Displays a progress bar while computing the reasons of the new delinquent accounts'
         )
 
     def handle(self, *args, **options):
@@ -48,26 +48,21 @@ class Command(BaseCommand):
         if dry_run:
             return
 
-        accounts = Account.objects.filter(id__in=new_delinquent_account_ids)
+        delinquent_account_ids = new_delinquent_account_ids
         if options['progress']:
             bar = progressbar.ProgressBar()
-            accounts = bar(accounts)
+            delinquent_account_ids = bar(delinquent_account_ids)
 
-        n_accounts_marked_as_delinquent = 0
-        for account in accounts:
-            reasons = get_reasons_account_is_violating_delinquent_criteria(account.id)
-            mark_account_as_delinquent(account.id, reason='. '.join(reasons))
-            n_accounts_marked_as_delinquent += 1
+        reason_by_account_id = {}
+        for account_id in delinquent_account_ids:
+            reasons = get_reasons_account_is_violating_delinquent_criteria(account_id)
+            reason_by_account_id[account_id] = '. '.join(reasons)
+        n_accounts_marked_as_delinquent = mark_accounts_as_delinquent(reason_by_account_id)
 
-        accounts = Account.objects.filter(id__in=new_compliant_account_ids)
-        if options['progress']:
-            bar = progressbar.ProgressBar()
-            accounts = bar(accounts)
-
-        n_accounts_marked_as_compliant = 0
-        for account in accounts:
-            mark_account_as_compliant(account.id, reason='Requirements met again')
-            n_accounts_marked_as_compliant += 1
+        n_accounts_marked_as_compliant = mark_accounts_as_compliant({
+            account_id: 'Requirements met again'
+            for account_id in new_compliant_account_ids
+        })
 
         logger.info(
             'update-accounts-delinquent-status',
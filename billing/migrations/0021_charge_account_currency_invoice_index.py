@@ -0,0 +1,17 @@
+# Generated by Django 3.2.3 on 2026-10-16 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0020_update_currency_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='charge',
+            index=models.Index(fields=['account', 'amount_currency', 'invoice'], name='billing_charge_acc_cur_inv'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.3 on 2026-10-16 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0021_charge_account_currency_invoice_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(condition=models.Q(status='PENDING'), fields=['due_date'], name='billing_invoice_payable'),
+        ),
+    ]
@@ -1,9 +1,10 @@
 import calendar
 import re
 import uuid
+from collections import defaultdict
 from datetime import date, datetime
 from decimal import Decimal
-from typing import DefaultDict, Dict
+from typing import DefaultDict, Dict, Iterable, Sequence
 from uuid import UUID
 
 from django.conf import settings
@@ -12,7 +13,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
 from django.db import models
-from django.db.models import CASCADE, Model, PROTECT, QuerySet, SET_NULL, Sum
+from django.db.models import CASCADE, Exists, IntegerField, Model, OuterRef, PROTECT, Q, QuerySet, SET_NULL, Sum, Value
 from django.utils.translation import gettext_lazy as _
 from django_fsm import FSMField, can_proceed, transition
 from djmoney.models.fields import CurrencyField, MoneyField
@@ -26,10 +27,53 @@ def total_amount(qs) -> Total:
     :param qs: A querystring containing objects that have an amount field of type Money.
     :return: A Total object.
     """
-    aggregate = qs.values('amount_currency').annotate(sum=Sum('amount'))
+    aggregate = qs.values('amount_currency').annotate(sum=Sum('amount')).order_by('amount_currency')
     return Total(Money(amount=r['sum'], currency=r['amount_currency']) for r in aggregate)
 
 
+def total_amount_difference(qs, minus_qs) -> Total:
+    """Like total_amount(qs) - total_amount(minus_qs), but in a single query.
+    :param qs: A querystring containing objects that have an amount field of type Money.
+    :param minus_qs: A querystring containing objects that have an amount field of type Money, to subtract.
+    :return: A Total object, with the currencies of qs first.
+    """
+    return total_amount_differences(qs, minus_qs).get((), Total())
+
+
+def total_amount_differences(qs, minus_qs, group_by: Sequence[str] = ()) -> Dict[tuple, Total]:
+    """Like total_amount_difference, but for each group of objects separately, still in a single query.
+    :param qs: A querystring containing objects that have an amount field of type Money.
+    :param minus_qs: A querystring containing objects that have an amount field of type Money, to subtract.
+    :param group_by: The fields whose values define the groups.
+    :return: A map from the tuple of group_by values to Total, with the currencies of qs first.
+             Groups without any object are missing.
+    """
+    def signed_sums(q, sign):
+        return q.order_by().values(*group_by, 'amount_currency').annotate(
+            sign=Value(sign, output_field=IntegerField()), sum=Sum('amount'))
+
+    aggregate = signed_sums(qs, 1).union(signed_sums(minus_qs, -1), all=True).order_by('-sign', 'amount_currency')
+    amounts: DefaultDict[tuple, Dict[str, Decimal]] = defaultdict(dict)
+    for r in aggregate:
+        group_amounts = amounts[tuple(r[field] for field in group_by)]
+        currency = r['amount_currency']
+        group_amounts[currency] = group_amounts.get(currency, Decimal(0)) + r['sign'] * r['sum']
+    return {group: Total(Money(amount=amount, currency=currency) for currency, amount in group_amounts.items())
+            for group, group_amounts in amounts.items()}
+
+
+def total_amount_by_invoice(qs) -> DefaultDict[int, Total]:
+    """Like total_amount, but sums the amounts of each invoice separately, still in a single query.
+    :param qs: A querystring containing objects that have an invoice and an amount field of type Money.
+    :return: A map from invoice id to Total. Invoices without any object map to an empty Total.
+    """
+    aggregate = qs.values('invoice_id', 'amount_currency').annotate(sum=Sum('amount'))
+    monies: DefaultDict[int, list] = defaultdict(list)
+    for r in aggregate:
+        monies[r['invoice_id']].append(Money(amount=r['sum'], currency=r['amount_currency']))
+    return defaultdict(Total, {invoice_id: Total(m) for invoice_id, m in monies.items()})
+
+
 ########################################################################################################
 # Accounts
 
@@ -38,17 +82,21 @@ class AccountQuerySet(models.QuerySet):
         return self.filter(status=Account.OPEN)
 
     def with_uninvoiced_positive_charges(self):
-        return self.filter(
-            charges__deleted=False,
-            charges__amount__gt=0,
-            charges__invoice__isnull=True
-        ).distinct()
+        # A semi-join, which stops at the first matching charge of each account and needs no distinct.
+        uninvoiced_positive_charges = Charge.objects.filter(
+            account=OuterRef('pk'),
+            amount__gt=0,
+            invoice__isnull=True
+        )
+        return self.annotate(has_uninvoiced_positive_charges=Exists(uninvoiced_positive_charges)) \
+            .filter(has_uninvoiced_positive_charges=True)
 
     def with_no_charges_since(self, dt: datetime):
         return self.exclude(charges__created__gte=dt)
 
     def with_pending_invoices(self):
-        return self.filter(invoices__status=Invoice.PENDING).distinct()
+        pending_invoices = Invoice.objects.filter(account=OuterRef('pk'), status=Invoice.PENDING)
+        return self.annotate(has_pending_invoices=Exists(pending_invoices)).filter(has_pending_invoices=True)
 
     def solvent(self, currency_threshold_price_map: Dict[str, Decimal]):
         from .actions.accounts import (
@@ -109,7 +157,7 @@ class Account(Model):
         if as_of is not None:
             charges = charges.filter(created__lte=as_of)
             transactions = transactions.filter(created__lte=as_of)
-        return total_amount(transactions) - total_amount(charges)
+        return total_amount_difference(transactions, charges)
 
     def is_solvent(
         self,
@@ -198,6 +246,12 @@ class Invoice(Model):
 
     objects = InvoiceQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # Payable invoices: only the pending ones are indexed, by due date.
+            models.Index(fields=['due_date'], name='billing_invoice_payable', condition=Q(status='PENDING')),
+        ]
+
     @transition(field=status, source=[PENDING], target=PAID)
     def pay(self):
         pass
@@ -227,7 +281,30 @@ class Invoice(Model):
         """
         invoice_charges = Charge.objects.filter(invoice=self)
         invoice_transactions = Transaction.successful.filter(invoice=self)
-        return total_amount(invoice_charges) - total_amount(invoice_transactions)
+        return total_amount_difference(invoice_charges, invoice_transactions)
+
+    @staticmethod
+    def total_charges_by_invoice(invoice_ids: Iterable[int]) -> DefaultDict[int, Total]:
+        """
+        Same as total_charges, for several invoices at once.
+        """
+        selected_charges = Charge.objects \
+            .filter(invoice_id__in=invoice_ids) \
+            .charges() \
+            .exclude(product_code=CARRIED_FORWARD)
+        return total_amount_by_invoice(selected_charges)
+
+    @staticmethod
+    def due_by_invoice(invoice_ids: Iterable[int]) -> Dict[int, Total]:
+        """
+        Same as due, for several invoices at once.
+        """
+        invoice_ids = list(invoice_ids)
+        due_by_invoice = total_amount_differences(
+            Charge.objects.filter(invoice_id__in=invoice_ids),
+            Transaction.successful.filter(invoice_id__in=invoice_ids),
+            group_by=['invoice_id'])
+        return {invoice_id: due_by_invoice.get((invoice_id,), Total()) for invoice_id in invoice_ids}
 
     def is_partially_paid(self) -> bool:
         return Transaction.successful.filter(invoice=self).exists()
@@ -295,6 +372,12 @@ class Charge(Model):
 
     all_charges = models.Manager()  # Includes deleted charges
 
+    class Meta:
+        indexes = [
+            # Uninvoiced charges of an account, summed and invoiced per currency.
+            models.Index(fields=['account', 'amount_currency', 'invoice'], name='billing_charge_acc_cur_inv'),
+        ]
+
     def clean(self):
         if not (self.ad_hoc_label or self.product_code):
             raise ValidationError('Either the ad-hoc-label or the product-code must be filled.')
@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _orjson_default(obj):
+    # DRF already turns most values into strings, what remains are decimals and lazy translations.
+    if isinstance(obj, (Decimal, Promise)):
+        return str(obj)
+    raise TypeError
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with orjson when it is installed, which is much faster on large nested payloads.
+    Falls back on the DRF renderer when orjson is missing or when an indented output is requested.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=_orjson_default)
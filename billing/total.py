@@ -42,9 +42,9 @@ class Total(object):
     def __init__(self, _money_obs=None, *args):
         all_args = [_money_obs] + list(args)
         if len(all_args) % 2 == 0:
-            _money_obs = []
-            for i in range(0, len(all_args) - 1, 2):
-                _money_obs.append(Money(all_args[i], all_args[i + 1]))
+            # Pair up the amounts and currencies by consuming the same iterator twice.
+            pairs = iter(all_args)
+            _money_obs = [Money(amount, currency) for amount, currency in zip(pairs, pairs)]
 
         self._money_obs = tuple(_money_obs or [])
         self._by_currency = {m.currency.code: m for m in self._money_obs}
@@ -74,7 +74,8 @@ class Total(object):
     def __add__(self, other):
         if not isinstance(other, Total):
             raise TypeError('Can only add/subtract Total instances, not Total and {}.'.format(type(other)))
-        by_currency = copy.deepcopy(self._by_currency)
+        # The monies are never mutated, only replaced, so a shallow copy is enough.
+        by_currency = dict(self._by_currency)
         for other_currency, other_money in other._by_currency.items():
             by_currency[other_currency] = other_money + self[other_currency]
         return self.__class__(by_currency.values())
@@ -92,16 +93,22 @@ class Total(object):
         return self.__class__([abs(m) for m in self._money_obs])
 
     def __bool__(self):
-        return any([bool(m) for m in self._money_obs])
+        return any(m.amount for m in self._money_obs)
 
     def __eq__(self, other):
-        if other == 0:
+        if isinstance(other, Total):
+            # Compare the amounts currency by currency, without building the difference Total.
+            currencies = self._by_currency.keys() | other._by_currency.keys()
+            return all(self._amount(c) == other._amount(c) for c in currencies)
+        elif other == 0:
             # Support comparing to integer/Decimal zero as it is useful
             return not self.__bool__()
-        elif not isinstance(other, Total):
-            raise TypeError('Can only compare Total objects to other '
-                            'Total objects, not to type {}'.format(type(other)))
-        return not self - other
+        raise TypeError('Can only compare Total objects to other '
+                        'Total objects, not to type {}'.format(type(other)))
+
+    def _amount(self, currency):
+        money = self._by_currency.get(currency)
+        return 0 if money is None else money.amount
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -122,9 +129,13 @@ class Total(object):
         """
         return [copy.copy(m) for m in self._money_obs if m.amount != 0]
 
+    def __iter__(self):
+        """Iterate over the underlying ``Money`` instances, including zero ones, without copying them."""
+        return iter(self._money_obs)
+
     def currencies(self):
         """Get all currencies, including those with zero values"""
-        return [m.currency.code for m in self.monies() if m.amount]
+        return [m.currency.code for m in self._money_obs if m.amount]
 
 
 class TotalSerializer(serializers.BaseSerializer):
@@ -137,7 +148,7 @@ class TotalSerializer(serializers.BaseSerializer):
         # We cannot use djmoney.contrib.django_rest_framework.MoneyField because a total is not a field.
         # So we replicate the output.
         return [{'amount': TotalSerializer.amount_serializer.to_representation(money.amount),
-                 'amount_currency': money.currency.code} for money in obj.nonzero_monies()]
+                 'amount_currency': money.currency.code} for money in obj if money.amount != 0]
 
 
 class TotalIncludingZeroSerializer(serializers.BaseSerializer):
@@ -150,4 +161,4 @@ class TotalIncludingZeroSerializer(serializers.BaseSerializer):
         # We cannot use djmoney.contrib.django_rest_framework.MoneyField because a total is not a field.
         # So we replicate the output.
         return [{'amount': TotalSerializer.amount_serializer.to_representation(money.amount),
-                 'amount_currency': money.currency.code} for money in obj.monies()]
+                 'amount_currency': money.currency.code} for money in obj]
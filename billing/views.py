@@ -1,10 +1,14 @@
 from datetime import date
+from typing import List
 
+from django.db.models import Prefetch
 from django.http import Http404
 from rest_framework import permissions, serializers
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import MethodNotAllowed
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.mixins import ListModelMixin, RetrieveModelMixin, UpdateModelMixin
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK
 from rest_framework.viewsets import GenericViewSet
@@ -14,6 +18,7 @@ from .actions.accounts import (
     charge_pending_invoices,
 )
 from .models import Account, Charge, CreditCard, Invoice, ProductProperty, Transaction
+from .renderers import FastJSONRenderer
 from .signals import debt_paid
 from .total import TotalIncludingZeroSerializer, TotalSerializer
 
@@ -23,7 +28,7 @@ class CreditCardSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = CreditCard
-        exclude = ['account', 'expiry_date', 'psp_content_type', 'psp_object_id']
+        fields = ['id', 'created', 'modified', 'type', 'number', 'expiry_month', 'expiry_year', 'status', 'expired']
 
     @staticmethod
     def get_expired(obj: CreditCard):
@@ -35,14 +40,18 @@ class CreditCardUpdateSerializer(serializers.ModelSerializer):
         model = CreditCard
         fields = ['status']
 
+    status_transitions = {
+        CreditCard.INACTIVE: CreditCard.deactivate,
+        CreditCard.ACTIVE: CreditCard.reactivate,
+    }
+
     def update(self, instance, validated_data):
         new_status = validated_data['status']
-        if new_status == CreditCard.INACTIVE:
-            instance.deactivate()
-        elif new_status == CreditCard.ACTIVE:
-            instance.reactivate()
-        else:
-            raise Exception('Unknown status')
+        try:
+            status_transition = self.status_transitions[new_status]
+        except KeyError:
+            raise serializers.ValidationError({'status': 'Unknown status'})
+        status_transition(instance)
         instance.save()
         return instance
 
@@ -56,41 +65,36 @@ class CreditCardViewSet(ListModelMixin, RetrieveModelMixin, UpdateModelMixin, Ge
     """
     http_method_names = ['get', 'patch']  # We don't want put (inherited from UpdateModelMixin)
 
+    serializer_class_by_method = {
+        'GET': CreditCardSerializer,
+        'PATCH': CreditCardUpdateSerializer,
+    }
+
     def get_queryset(self):
         return CreditCard.objects.filter(account__owner=self.request.user)
 
     def get_serializer_class(self):
         method = self.request.method
-        if method == 'GET':
-            return CreditCardSerializer
-        elif method == 'PATCH':
-            return CreditCardUpdateSerializer
-        else:
-            raise Exception('Unknown method')
+        try:
+            return self.serializer_class_by_method[method]
+        except KeyError:
+            raise MethodNotAllowed(method)
 
 
 ########################################################################################################
 
-class ProductPropertyListSerializer(serializers.ListSerializer):
-    # From: https://stackoverflow.com/questions/31583445
-    def to_representation(self, data):
-        r = super().to_representation(data)
-        return {item['name']: item['value'] for item in r}
-
-
-class ProductPropertySerializer(serializers.ModelSerializer):
-    class Meta:
-        model = ProductProperty
-        fields = ['name', 'value']
-        list_serializer_class = ProductPropertyListSerializer
-
-
 class ChargeSerializer(serializers.ModelSerializer):
-    product_properties = ProductPropertySerializer(read_only=True, many=True)
+    product_properties = serializers.SerializerMethodField()
 
     class Meta:
         model = Charge
-        exclude = ['account', 'deleted', 'reverses']
+        fields = ['id', 'created', 'modified', 'invoice', 'amount', 'amount_currency', 'ad_hoc_label', 'product_code',
+                  'product_properties']
+
+    @staticmethod
+    def get_product_properties(obj: Charge):
+        # Built straight from the (prefetched) properties, without a nested serializer per property.
+        return {p.name: p.value for p in obj.product_properties.all()}
 
 
 ########################################################################################################
@@ -98,23 +102,46 @@ class ChargeSerializer(serializers.ModelSerializer):
 class TransactionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaction
-        exclude = ['account', 'psp_content_type', 'psp_object_id']
+        fields = ['id', 'created', 'modified', 'success', 'invoice', 'amount', 'amount_currency', 'payment_method',
+                  'credit_card_number']
 
 
 ########################################################################################################
 
 class InvoiceSerializer(serializers.ModelSerializer):
-    due = TotalIncludingZeroSerializer(read_only=True)
+    due = serializers.SerializerMethodField()
     # We keep the old 'total' field name for API compatiblity.
-    total = TotalSerializer(source='total_charges', read_only=True)
+    total = serializers.SerializerMethodField()
 
     class Meta:
         model = Invoice
-        exclude = ['account']
+        fields = ['id', 'created', 'modified', 'due_date', 'status', 'due', 'total']
+
+    def get_due(self, obj: Invoice):
+        # The view can precompute the amounts of all its invoices, see AccountView.
+        due_by_invoice = self.context.get('due_by_invoice')
+        due = obj.due() if due_by_invoice is None else due_by_invoice[obj.pk]
+        return TotalIncludingZeroSerializer().to_representation(due)
+
+    def get_total(self, obj: Invoice):
+        total_charges_by_invoice = self.context.get('total_charges_by_invoice')
+        if total_charges_by_invoice is None:
+            total_charges = obj.total_charges()
+        else:
+            total_charges = total_charges_by_invoice[obj.pk]
+        return TotalSerializer().to_representation(total_charges)
 
 
 ########################################################################################################
 
+def _serialized_columns(serializer_class) -> List[str]:
+    """
+    The fields of the serializer that are columns of its model, the others are computed by the serializer.
+    """
+    model_fields = {field.name for field in serializer_class.Meta.model._meta.concrete_fields}
+    return [name for name in serializer_class.Meta.fields if name in model_fields]
+
+
 class AccountSerializer(serializers.ModelSerializer):
     balance = TotalIncludingZeroSerializer(read_only=True)
     credit_cards = CreditCardSerializer(read_only=True, many=True)
@@ -124,7 +151,8 @@ class AccountSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Account
-        exclude = ['owner']
+        fields = ['id', 'created', 'modified', 'currency', 'status', 'delinquent', 'balance', 'credit_cards',
+                  'charges', 'invoices', 'transactions']
 
 
 @permission_classes([permissions.IsAuthenticated])
@@ -134,17 +162,44 @@ class AccountView(RetrieveAPIView):
     """
     serializer_class = AccountSerializer
     pagination_class = None
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
     def get_object(self):
-        try:
-            return Account.objects.open() \
-                .prefetch_related('invoices') \
-                .prefetch_related('credit_cards') \
-                .prefetch_related('transactions') \
-                .prefetch_related('charges__product_properties') \
-                .get(owner=self.request.user)
-        except Account.DoesNotExist:
+        # owner is unique, so the first match is the only one.
+        account = Account.objects.open() \
+            .prefetch_related(*self.prefetches()) \
+            .filter(owner=self.request.user) \
+            .first()
+        if account is None:
             raise Http404('No Account matches the given query.')
+        return account
+
+    def retrieve(self, request, *args, **kwargs):
+        account = self.get_object()
+        # Compute the amounts of all the invoices with a few grouped queries, instead of a few queries per invoice.
+        invoice_ids = [invoice.pk for invoice in account.invoices.all()]
+        context = self.get_serializer_context()
+        context['due_by_invoice'] = Invoice.due_by_invoice(invoice_ids)
+        context['total_charges_by_invoice'] = Invoice.total_charges_by_invoice(invoice_ids)
+        serializer = self.get_serializer_class()(account, context=context)
+        return Response(serializer.data)
+
+    @staticmethod
+    def prefetches():
+        # Only load the columns the serializers expose, plus the foreign keys used to join the prefetches
+        # and the credit card expiry date that 'expired' is computed from.
+        return [
+            Prefetch('invoices', queryset=Invoice.objects.only(
+                *_serialized_columns(InvoiceSerializer), 'account')),
+            Prefetch('credit_cards', queryset=CreditCard.objects.only(
+                *_serialized_columns(CreditCardSerializer), 'account', 'expiry_date')),
+            Prefetch('transactions', queryset=Transaction.objects.only(
+                *_serialized_columns(TransactionSerializer), 'account')),
+            Prefetch('charges', queryset=Charge.objects.only(
+                *_serialized_columns(ChargeSerializer), 'account')),
+            Prefetch('charges__product_properties', queryset=ProductProperty.objects.only(
+                'id', 'charge', 'name', 'value')),
+        ]
 
 
 @permission_classes([permissions.IsAuthenticated])
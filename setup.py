@@ -32,6 +32,9 @@ setup(
         'typing',
         'progressbar2',
     ],
+    extras_require={
+        'orjson': ['orjson'],
+    },
     license=billing.__licence__,
     classifiers=[
         'Development Status :: 5 - Production/Stable',
@@ -7,28 +7,32 @@ from moneyed import Money
 from pytest import raises
 
 from billing.actions import accounts
-from billing.models import Account, Charge, CreditCard, Invoice
-from billing.signals import invoice_ready
+from billing.models import Account, Charge, CreditCard, EventLog, Invoice
+from billing.signals import invoice_ready, new_compliant_account, new_delinquent_account
 from billing.total import Total
 from ..helper import catch_signal
 
 
 class AccountActionsTest(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         user = User.objects.create_user('a-username')
-        self.account = Account.objects.create(owner=user, currency='CHF')
-        self.account.delinquent = False
-        self.account.save()
+        cls.account = Account.objects.create(owner=user, currency='CHF', delinquent=False)
         expiry_date = date.today() + timedelta(days=365)
-        self.credit_card = CreditCard.objects.create(
-            account=self.account,
+        cls.credit_card = CreditCard.objects.create(
+            account=cls.account,
             type='VIS',
             number='4111xxxxxxxx1111',
             expiry_month=expiry_date.month,
             expiry_year=expiry_date.year % 100,
-            psp_object=self.account,
+            psp_object=cls.account,
         )
 
+    def setUp(self):
+        # Some tests change the shared account and credit card, which Django 2.2 doesn't copy between tests.
+        self.account.refresh_from_db()
+        self.credit_card.refresh_from_db()
+
     def test_it_should_add_charge(self):
         with self.assertNumQueries(4):
             accounts.add_charge(
@@ -38,7 +42,7 @@ class AccountActionsTest(TestCase):
                 product_properties={'color': 'blue', 'fabric': 'cotton', 'size': 'M'})
 
         # Now verify what's been written to the db
-        retrieved = Charge.objects.all()[0]
+        retrieved = Charge.objects.prefetch_related('product_properties').first()
         product_properties_dict = {p.name: p.value for p in retrieved.product_properties.all()}
         assert product_properties_dict == {
             'color': 'blue',
@@ -60,13 +64,17 @@ class AccountActionsTest(TestCase):
 
     def test_it_should_not_create_invoice_no_charges_are_due(self):
         invoice = Invoice.objects.create(account=self.account, due_date=date.today())
-        Charge.objects.create(account=self.account, amount=Money(10, 'CHF'), product_code='DELETED', deleted=True)
-        Charge.objects.create(account=self.account, amount=Money(30, 'CHF'), product_code='INVOICED', invoice=invoice)
+        Charge.objects.bulk_create([
+            Charge(account=self.account, amount=Money(10, 'CHF'), product_code='DELETED', deleted=True),
+            Charge(account=self.account, amount=Money(30, 'CHF'), product_code='INVOICED', invoice=invoice),
+        ])
         assert not accounts.create_invoices(account_id=self.account.pk, due_date=date.today())
 
     def test_it_should_create_an_invoice_when_money_is_due(self):
-        Charge.objects.create(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=self.account, amount=Money(-3, 'CHF'), product_code='ACREDIT')
+        Charge.objects.bulk_create([
+            Charge(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, amount=Money(-3, 'CHF'), product_code='ACREDIT'),
+        ])
 
         invoices = accounts.create_invoices(account_id=self.account.pk, due_date=date.today())
         assert len(invoices) == 1
@@ -79,8 +87,10 @@ class AccountActionsTest(TestCase):
         assert not accounts.create_invoices(account_id=self.account.pk, due_date=date.today())
 
     def test_it_should_create_an_invoice_even_when_enough_credit(self):
-        Charge.objects.create(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=self.account, amount=Money(-30, 'CHF'), product_code='ACREDIT')
+        Charge.objects.bulk_create([
+            Charge(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, amount=Money(-30, 'CHF'), product_code='ACREDIT'),
+        ])
         invoices = accounts.create_invoices(account_id=self.account.pk, due_date=date.today())
         assert len(invoices) == 1
         invoice = invoices[0]
@@ -89,14 +99,16 @@ class AccountActionsTest(TestCase):
         assert invoice.items.count() == 1
 
     def test_it_should_handle_multicurrency_univoiced_charges(self):
-        Charge.objects.create(account=self.account, amount=Money(10, 'CHF'), product_code='10CHF')
-        Charge.objects.create(account=self.account, amount=Money(30, 'EUR'), product_code='30EURO')
+        Charge.objects.bulk_create([
+            Charge(account=self.account, amount=Money(10, 'CHF'), product_code='10CHF'),
+            Charge(account=self.account, amount=Money(30, 'EUR'), product_code='30EURO'),
+        ])
 
         invoices = accounts.create_invoices(account_id=self.account.pk, due_date=date.today())
 
         assert len(invoices) == 2
 
-        # For some reason the output is always sorted. This makes asserting easy
+        # The invoices are created in currency order. This makes asserting easy
         invoice1 = invoices[0]
         items1 = invoice1.items.all()
         assert len(items1) == 1
@@ -164,8 +176,7 @@ class AccountActionsTest(TestCase):
             account_id=self.account.pk,
             due_date=date.today()
         )[0]
-        invoice.status = Invoice.PAID
-        invoice.save()
+        Invoice.objects.filter(pk=invoice.pk).update(status=Invoice.PAID)
         new_delinquent_account_ids, _ = (
             accounts.get_accounts_which_delinquent_status_has_to_change(
                 [self.account.id]
@@ -182,3 +193,35 @@ class AccountActionsTest(TestCase):
             )
         )
         assert compliant_account_ids
+
+    def test_it_should_mark_accounts_as_delinquent(self):
+        with catch_signal(new_delinquent_account) as signal_handler:
+            marked = accounts.mark_accounts_as_delinquent({self.account.id: 'A reason'})
+        assert marked == 1
+        assert signal_handler.call_count == 1
+        self.account.refresh_from_db()
+        assert self.account.delinquent
+        assert EventLog.objects.new_delinquent().get().text == 'A reason'
+
+    def test_it_should_not_mark_delinquent_accounts_as_delinquent_again(self):
+        self.account.delinquent = True
+        self.account.save()
+        with self.assertNumQueries(1):
+            marked = accounts.mark_accounts_as_delinquent({self.account.id: 'A reason'})
+        assert marked == 0
+        assert not EventLog.objects.exists()
+
+    def test_it_should_not_query_the_db_when_there_are_no_accounts_to_mark(self):
+        with self.assertNumQueries(0):
+            assert accounts.mark_accounts_as_compliant({}) == 0
+
+    def test_it_should_mark_accounts_as_compliant(self):
+        self.account.delinquent = True
+        self.account.save()
+        with catch_signal(new_compliant_account) as signal_handler:
+            marked = accounts.mark_accounts_as_compliant({self.account.id: 'A reason'})
+        assert marked == 1
+        assert signal_handler.call_count == 1
+        self.account.refresh_from_db()
+        assert not self.account.delinquent
+        assert EventLog.objects.get().type == EventLog.NEW_COMPLIANT
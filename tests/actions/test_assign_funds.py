@@ -14,15 +14,16 @@ class AssignFundsToInvoiceTest(TestCase):
     """ Test assigning funds to a single invoice.
     """
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         user = User.objects.create_user('a-username')
-        self.account = Account.objects.create(owner=user, currency='CHF')
+        cls.account = Account.objects.create(owner=user, currency='CHF')
 
     def test_it_should_do_nothing_when_no_funds(self):
         invoice = Invoice.objects.create(account_id=self.account.id, due_date=date.today())
         Charge.objects.create(account=self.account, invoice=invoice, amount=Money(40, 'CHF'), product_code='ACHARGE')
 
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert not paid
 
@@ -33,7 +34,7 @@ class AssignFundsToInvoiceTest(TestCase):
         invoice = Invoice.objects.create(account_id=self.account.id, due_date=date.today())
         Charge.objects.create(account=self.account, invoice=invoice, amount=Money(40, 'CHF'), product_code='ACHARGE')
 
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert not paid
 
@@ -42,7 +43,7 @@ class AssignFundsToInvoiceTest(TestCase):
         Charge.objects.create(account=self.account, invoice=invoice, amount=Money(40, 'CHF'), product_code='ACHARGE')
         Transaction.objects.create(account=self.account, amount=Money(100, 'CHF'), success=False)
 
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert not paid
 
@@ -51,7 +52,7 @@ class AssignFundsToInvoiceTest(TestCase):
         Charge.objects.create(account=self.account, invoice=invoice, amount=Money(40, 'CHF'), product_code='ACHARGE')
         transaction = Transaction.objects.create(account=self.account, amount=Money(31, 'CHF'), success=True)
 
-        with self.assertNumQueries(6):
+        with self.assertNumQueries(5):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert not paid
         transaction.refresh_from_db()
@@ -65,7 +66,7 @@ class AssignFundsToInvoiceTest(TestCase):
         Charge.objects.create(account=self.account, invoice=invoice, amount=Money(40, 'CHF'), product_code='ACHARGE')
         transaction = Transaction.objects.create(account=self.account, amount=Money(40, 'CHF'), success=True)
 
-        with self.assertNumQueries(7):
+        with self.assertNumQueries(6):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert paid
         transaction.refresh_from_db()
@@ -79,7 +80,7 @@ class AssignFundsToInvoiceTest(TestCase):
         Charge.objects.create(account=self.account, invoice=invoice, amount=Money(40, 'CHF'), product_code='ACHARGE')
         credit = Charge.objects.create(account=self.account, amount=Money(-40, 'CHF'))
 
-        with self.assertNumQueries(7):
+        with self.assertNumQueries(6):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert paid
         credit.refresh_from_db()
@@ -91,10 +92,12 @@ class AssignFundsToInvoiceTest(TestCase):
     def test_it_should_assign_multiple_payments_to_invoice_and_pay_it(self):
         invoice = Invoice.objects.create(account_id=self.account.id, due_date=date.today())
         Charge.objects.create(account=self.account, invoice=invoice, amount=Money(40, 'CHF'), product_code='ACHARGE')
-        transaction_1 = Transaction.objects.create(account=self.account, amount=Money(15, 'CHF'), success=True)
-        transaction_2 = Transaction.objects.create(account=self.account, amount=Money(25, 'CHF'), success=True)
+        transaction_1, transaction_2 = Transaction.objects.bulk_create([
+            Transaction(account=self.account, amount=Money(15, 'CHF'), success=True),
+            Transaction(account=self.account, amount=Money(25, 'CHF'), success=True),
+        ])
 
-        with self.assertNumQueries(8):
+        with self.assertNumQueries(7):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert paid
         transaction_1.refresh_from_db()
@@ -112,7 +115,7 @@ class AssignFundsToInvoiceTest(TestCase):
         transaction_2 = Transaction.objects.create(account=self.account, amount=Money(6, 'CHF'), success=True)
         transaction_3 = Transaction.objects.create(account=self.account, amount=Money(7, 'CHF'), success=True)
 
-        with self.assertNumQueries(8):
+        with self.assertNumQueries(7):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert paid
         transaction_1.refresh_from_db()
@@ -128,7 +131,7 @@ class AssignFundsToInvoiceTest(TestCase):
         transaction = Transaction.objects.create(account=self.account, amount=Money(10, 'CHF'), success=True)
         credit = Charge.objects.create(account=self.account, amount=Money(-10, 'CHF'), product_code='ACREDIT')
 
-        with self.assertNumQueries(7):
+        with self.assertNumQueries(6):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert paid
         # Verify that the credit was used (even though the transaction was older)
@@ -143,7 +146,7 @@ class AssignFundsToInvoiceTest(TestCase):
                                        amount=Money(40, 'CHF'), product_code='ACHARGE')
         transaction = Transaction.objects.create(account=self.account, amount=Money(50, 'CHF'), success=True)
 
-        with self.assertNumQueries(11):
+        with self.assertNumQueries(10):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert paid
         transaction.refresh_from_db()
@@ -169,7 +172,7 @@ class AssignFundsToInvoiceTest(TestCase):
         Transaction.objects.create(account=self.account, invoice=invoice, amount=Money(40, 'CHF'), success=True)
         Charge.objects.create(account=self.account, invoice=invoice, amount=Money(40, 'CHF'), product_code='ACHARGE')
 
-        with self.assertNumQueries(4):
+        with self.assertNumQueries(3):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert paid
         assert invoice.due() == Total([Money(0, 'CHF')])
@@ -180,7 +183,7 @@ class AssignFundsToInvoiceTest(TestCase):
         Transaction.objects.create(account=self.account, amount=Money(40, 'EUR'), success=True)
         Charge.objects.create(account=self.account, amount=Money(-40, 'EUR'))
 
-        with self.assertNumQueries(5):
+        with self.assertNumQueries(4):
             paid = accounts.assign_funds_to_invoice(invoice_id=invoice.pk)
         assert not paid
 
@@ -189,9 +192,12 @@ class AssignFundsToAccountPendingInvoicesTest(TestCase):
     """ Test the chaining of assigning funds to multiple invoices in an account.
     """
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         user = User.objects.create_user('a-username')
-        self.account = Account.objects.create(owner=user, currency='CHF')
+        cls.account = Account.objects.create(owner=user, currency='CHF')
+
+    def setUp(self):
         Transaction.objects.create(account=self.account, amount=Money(30, 'CHF'), success=True)
         self.invoice1 = Invoice.objects.create(account_id=self.account.id, due_date=date.today())
         Charge.objects.create(account=self.account, invoice=self.invoice1, amount=Money(40, 'CHF'),
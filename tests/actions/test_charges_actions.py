@@ -10,15 +10,16 @@ from billing.models import Account, Charge, Invoice
 
 
 class ChargeActionsTest(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         user = User.objects.create_user('a-username')
-        self.account = Account.objects.create(owner=user, currency='CHF')
+        cls.account = Account.objects.create(owner=user, currency='CHF')
 
     def test_it_should_delete_uninvoiced_charge(self):
         charge = Charge.objects.create(account=self.account, amount=Money(10, 'CHF'), product_code='10CHF')
         charges.cancel_charge(charge.pk)
         # Check in db
-        retrieved = Charge.all_charges.all()[0]
+        retrieved = Charge.all_charges.first()
         assert retrieved.deleted
 
     def test_it_should_create_reversal_credit_for_invoiced_charge(self):
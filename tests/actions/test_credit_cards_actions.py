@@ -8,13 +8,17 @@ from ..models import MyPSPCreditCard
 
 
 class CreditCardActionsTest(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         user = User.objects.create_user('a-username')
-        account = Account.objects.create(owner=user, currency='CHF')
-        psp_credit_card = MyPSPCreditCard.objects.create(token='atoken')
-        self.cc = CreditCard.objects.create(account=account, type='VIS',
+        cls.account = Account.objects.create(owner=user, currency='CHF')
+        cls.psp_credit_card = MyPSPCreditCard.objects.create(token='atoken')
+
+    def setUp(self):
+        # Created per test, because the tests change its status.
+        self.cc = CreditCard.objects.create(account=self.account, type='VIS',
                                             number='1111', expiry_month=12, expiry_year=30,
-                                            psp_object=psp_credit_card)
+                                            psp_object=self.psp_credit_card)
 
     def test_it_should_deactivate_a_credit_card(self):
         credit_cards.deactivate(self.cc.id)
@@ -7,95 +7,75 @@ from pytest import raises
 
 from billing.actions import invoices
 from billing.models import Account, Charge, CreditCard, Invoice
-from billing.psp import register, unregister
+from ..helper import MyPSPMixin
 from ..models import MyPSPCreditCard
-from ..my_psp import MyPSP
 
 
-class InvoicesActionsTest(TestCase):
-    def setUp(self):
-        self.psp = MyPSP()
-        register(self.psp)
+class InvoicesActionsTest(MyPSPMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user('a-username')
+        cls.account = Account.objects.create(owner=user, currency='CHF')
+        cls.psp_credit_card = MyPSPCreditCard.objects.create(token='atoken')
 
-    def tearDown(self):
-        unregister(self.psp)
+    def create_payable_invoice(self, expiry_year=30):
+        CreditCard.objects.create(account=self.account, type='VIS',
+                                  number='1111', expiry_month=12, expiry_year=expiry_year,
+                                  psp_object=self.psp_credit_card)
+        invoice = Invoice.objects.create(account=self.account, due_date=date.today())
+        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE')
+        return invoice
 
     def test_it_should_prevent_paying_an_empty_invoice(self):
-        user = User.objects.create_user('a-username')
-        account = Account.objects.create(owner=user, currency='CHF')
-        psp_credit_card = MyPSPCreditCard.objects.create(token='atoken')
+        account = self.account
         CreditCard.objects.create(account=account, type='VIS',
                                   number='1111', expiry_month=12, expiry_year=30,
-                                  psp_object=psp_credit_card)
+                                  psp_object=self.psp_credit_card)
         invoice = Invoice.objects.create(account=account, due_date=date.today())
 
         with raises(invoices.PreconditionError, match='Cannot pay empty invoice\\.'):
             invoices.pay_with_account_credit_cards(invoice.pk)
 
     def test_it_should_prevent_paying_an_already_paid_invoice(self):
-        user = User.objects.create_user('a-username')
-        account = Account.objects.create(owner=user, currency='CHF')
+        account = self.account
         invoice = Invoice.objects.create(account=account, due_date=date.today(), status=Invoice.PAID)
 
         with raises(invoices.PreconditionError, match='Cannot pay invoice with status PAID\\.'):
             invoices.pay_with_account_credit_cards(invoice.pk)
 
     def test_it_should_not_attempt_payment_when_no_valid_credit_card(self):
-        user = User.objects.create_user('a-username')
-        account = Account.objects.create(owner=user, currency='CHF')
-        psp_credit_card = MyPSPCreditCard.objects.create(token='atoken')
-        CreditCard.objects.create(account=account, type='VIS',
-                                  number='1111', expiry_month=12, expiry_year=11,
-                                  psp_object=psp_credit_card)
-        invoice = Invoice.objects.create(account=account, due_date=date.today())
-        Charge.objects.create(account=account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE')
+        invoice = self.create_payable_invoice(expiry_year=11)
 
         with raises(invoices.PreconditionError, match='No valid credit card on account\\.'):
             invoices.pay_with_account_credit_cards(invoice.pk)
 
     def test_it_should_not_attempt_payment_when_closed_account(self):
-        user = User.objects.create_user('a-username')
-        account = Account.objects.create(owner=user, currency='CHF', status=Account.CLOSED)
-        psp_credit_card = MyPSPCreditCard.objects.create(token='atoken')
-        CreditCard.objects.create(account=account, type='VIS',
-                                  number='1111', expiry_month=12, expiry_year=30,
-                                  psp_object=psp_credit_card)
-        invoice = Invoice.objects.create(account=account, due_date=date.today())
-        Charge.objects.create(account=account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE')
+        Account.objects.filter(pk=self.account.pk).update(status=Account.CLOSED)
+        account = self.account
+        invoice = self.create_payable_invoice()
 
         with raises(invoices.PreconditionError, match=f'Cannot pay invoice with closed account {account}.'):
             invoices.pay_with_account_credit_cards(invoice.pk)
 
     def test_it_should_pay_when_all_is_right(self):
-        user = User.objects.create_user('a-username')
-        account = Account.objects.create(owner=user, currency='CHF')
-        psp_credit_card = MyPSPCreditCard.objects.create(token='atoken')
-        CreditCard.objects.create(account=account, type='VIS',
-                                  number='1111', expiry_month=12, expiry_year=30,
-                                  psp_object=psp_credit_card)
-        invoice = Invoice.objects.create(account=account, due_date=date.today())
-        Charge.objects.create(account=account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE')
+        account = self.account
+        invoice = self.create_payable_invoice()
 
-        payment = invoices.pay_with_account_credit_cards(invoice.pk)
+        with self.assertNumQueries(10):
+            payment = invoices.pay_with_account_credit_cards(invoice.pk)
         assert payment
         assert payment.success
 
         invoice.refresh_from_db()
         assert invoice.status == Invoice.PAID
-        assert invoice.transactions.count() == 1
-        assert invoice.transactions.first() == payment
-
-        account.refresh_from_db()
-        assert account.transactions.count() == 1
-        assert account.transactions.first() == payment
+        assert list(invoice.transactions.all()) == [payment]
+        assert list(account.transactions.all()) == [payment]
 
     def test_it_should_use_active_credit_cards_before_inactive(self):
-        user = User.objects.create_user('a-username')
-        account = Account.objects.create(owner=user, currency='CHF')
-        psp_credit_card_1111 = MyPSPCreditCard.objects.create(token='atoken')
+        account = self.account
         CreditCard.objects.create(account=account, type='VIS',
                                   number='1111', expiry_month=12, expiry_year=30,
-                                  psp_object=psp_credit_card_1111, status=CreditCard.INACTIVE)
+                                  psp_object=self.psp_credit_card, status=CreditCard.INACTIVE)
         psp_credit_card_2222 = MyPSPCreditCard.objects.create(token='btoken')
         CreditCard.objects.create(account=account, type='VIS',
                                   number='2222', expiry_month=12, expiry_year=30,
@@ -104,14 +84,14 @@ class InvoicesActionsTest(TestCase):
         invoice = Invoice.objects.create(account=account, due_date=date.today())
         Charge.objects.create(account=account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE')
 
-        payment = invoices.pay_with_account_credit_cards(invoice.pk)
+        with self.assertNumQueries(10):
+            payment = invoices.pay_with_account_credit_cards(invoice.pk)
         assert payment
         assert payment.success
         assert payment.credit_card_number == '2222'
 
     def test_it_should_return_ok_when_all_invoices_are_ok(self):
-        user = User.objects.create_user('a-username')
-        account = Account.objects.create(owner=user, currency='CHF')
+        account = self.account
         Invoice.objects.create(
             account=account,
             due_date=date.today(),
@@ -123,8 +103,7 @@ class InvoicesActionsTest(TestCase):
         assert all_ok is True
 
     def test_it_should_return_not_ok_when_a_invoice_is_not_ok(self):
-        user = User.objects.create_user('a-username')
-        account = Account.objects.create(owner=user, currency='CHF')
+        account = self.account
         invoice = Invoice.objects.create(
             account=account,
             due_date=date.today(),
@@ -1,7 +1,31 @@
 import django
 import os
 
+import pytest
+
 
 def pytest_configure(config):
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
     django.setup()
+
+
+@pytest.fixture(scope='session')
+def warmed_content_types(django_db_setup, django_db_blocker):
+    """
+    Fill the content type cache once per session, so that the first test that sets a psp_object does not pay for
+    the lookup, and so that query counts don't depend on the order in which the tests run.
+    """
+    from django.apps import apps
+    from django.contrib.contenttypes.models import ContentType
+
+    with django_db_blocker.unblock():
+        ContentType.objects.get_for_models(*apps.get_models())
+
+
+@pytest.fixture(autouse=True)
+def warm_content_types(request):
+    # Only for the tests that use the db, so that a run of db-free tests doesn't create the test database.
+    from django.test import TransactionTestCase
+
+    if isinstance(request.instance, TransactionTestCase) or request.node.get_closest_marker('django_db'):
+        request.getfixturevalue('warmed_content_types')
@@ -3,6 +3,9 @@ from unittest import mock
 
 from django.db.models import Model
 
+from billing.psp import register, unregister
+from .my_psp import MyPSP
+
 
 @contextmanager
 def catch_signal(signal):
@@ -12,16 +15,43 @@ def catch_signal(signal):
     """
     handler = mock.Mock()
     signal.connect(handler)
-    yield handler
-    signal.disconnect(handler)
+    try:
+        yield handler
+    finally:
+        signal.disconnect(handler)
 
 
 @contextmanager
 def silence_signal(signal):
     receivers = signal.receivers
     signal.receivers = []
-    yield
-    signal.receivers = receivers
+    try:
+        yield
+    finally:
+        signal.receivers = receivers
+
+
+class MyPSPMixin:
+    """
+    Registers a MyPSP for the duration of the test class, as self.psp.
+    Its recorded charges and refunds are cleared before each test.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.psp = MyPSP()
+        register(cls.psp)
+
+    @classmethod
+    def tearDownClass(cls):
+        unregister(cls.psp)
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.psp.charges.clear()
+        self.psp.refunds.clear()
 
 
 def assert_attrs(entity, expected_attrs):
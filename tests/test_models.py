@@ -3,7 +3,7 @@ from decimal import Decimal
 
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
@@ -17,9 +17,10 @@ from .models import MyPSPCreditCard, MyPSPPayment
 
 
 class InvoiceTest(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         user = User.objects.create_user('a-username')
-        self.account = Account.objects.create(owner=user, currency='CHF')
+        cls.account = Account.objects.create(owner=user, currency='CHF')
 
     def test_payments_should_ignore_refunds(self):
         Transaction.objects.create(account=self.account, success=True, amount=Money(-10, 'CHF'))
@@ -73,59 +74,88 @@ class InvoiceTest(TestCase):
 
     def test_it_should_compute_the_invoice_due(self):
         invoice = Invoice.objects.create(account=self.account, due_date=date.today())
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(-3, 'CHF'), product_code='ACREDIT')
-        with self.assertNumQueries(2):
+        Charge.objects.bulk_create([
+            Charge(account=self.account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, invoice=invoice, amount=Money(-3, 'CHF'), product_code='ACREDIT'),
+        ])
+        with self.assertNumQueries(1):
             assert invoice.due() == Total(7, 'CHF')
 
     def test_it_should_compute_the_invoice_due_ignoring_deleted_charges(self):
         invoice = Invoice.objects.create(account=self.account, due_date=date.today())
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(-3, 'CHF'), product_code='ACREDIT')
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(1000, 'CHF'), product_code='ACHARGE',
-                              deleted=True)
-        with self.assertNumQueries(2):
+        Charge.objects.bulk_create([
+            Charge(account=self.account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, invoice=invoice, amount=Money(-3, 'CHF'), product_code='ACREDIT'),
+            Charge(account=self.account, invoice=invoice, amount=Money(1000, 'CHF'), product_code='ACHARGE',
+                   deleted=True),
+        ])
+        with self.assertNumQueries(1):
             assert invoice.due() == Total(7, 'CHF')
 
     def test_it_should_compute_the_invoice_due_in_multiple_currencies(self):
         invoice = Invoice.objects.create(account=self.account, due_date=date.today())
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(-3, 'EUR'), product_code='ACREDIT')
-        with self.assertNumQueries(2):
+        Charge.objects.bulk_create([
+            Charge(account=self.account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, invoice=invoice, amount=Money(-3, 'EUR'), product_code='ACREDIT'),
+        ])
+        with self.assertNumQueries(1):
             assert invoice.due() == Total(10, 'CHF', -3, 'EUR')
 
     def test_it_should_compute_the_invoice_due_when_there_are_transactions(self):
         invoice = Invoice.objects.create(account=self.account, due_date=date.today())
         Charge.objects.create(account=self.account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE')
         Transaction.objects.create(account=self.account, invoice=invoice, amount=Money(8, 'CHF'), success=True)
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             assert invoice.due() == Total(2, 'CHF')
 
     def test_it_should_compute_the_invoice_due_when_overpayment(self):
         invoice = Invoice.objects.create(account=self.account, due_date=date.today())
         Charge.objects.create(account=self.account, invoice=invoice, amount=Money(10, 'CHF'), product_code='ACHARGE')
         Transaction.objects.create(account=self.account, invoice=invoice, amount=Money(15, 'CHF'), success=True)
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             assert invoice.due() == Total(-5, 'CHF')
 
     def test_total_charges_should_select_just_the_right_charges(self):
         invoice = Invoice.objects.create(account=self.account, due_date=date.today())
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(8, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(2, 'CHF'), product_code='BCHARGE')
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(-1, 'CHF'), product_code='ACREDIT')
-        Charge.objects.create(account=self.account, invoice=invoice, amount=Money(6, 'CHF'),
-                              product_code=CARRIED_FORWARD)
+        Charge.objects.bulk_create([
+            Charge(account=self.account, invoice=invoice, amount=Money(8, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, invoice=invoice, amount=Money(2, 'CHF'), product_code='BCHARGE'),
+            Charge(account=self.account, invoice=invoice, amount=Money(-1, 'CHF'), product_code='ACREDIT'),
+            Charge(account=self.account, invoice=invoice, amount=Money(6, 'CHF'),
+                   product_code=CARRIED_FORWARD),
+        ])
         Transaction.objects.create(account=self.account, invoice=invoice, amount=Money(15, 'CHF'), success=True)
         with self.assertNumQueries(1):
             assert invoice.total_charges() == Total(10, 'CHF')
         # Just to demonstrate that the due amount is completely different:
         assert invoice.due() == Total(0, 'CHF')
 
+    def test_it_should_compute_the_due_and_total_charges_of_several_invoices(self):
+        invoice1 = Invoice.objects.create(account=self.account, due_date=date.today())
+        invoice2 = Invoice.objects.create(account=self.account, due_date=date.today())
+        invoice3 = Invoice.objects.create(account=self.account, due_date=date.today())
+        Charge.objects.bulk_create([
+            Charge(account=self.account, invoice=invoice1, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, invoice=invoice1, amount=Money(-3, 'CHF'), product_code='ACREDIT'),
+            Charge(account=self.account, invoice=invoice2, amount=Money(5, 'EUR'), product_code='ACHARGE'),
+        ])
+        Transaction.objects.create(account=self.account, invoice=invoice2, amount=Money(5, 'EUR'), success=True)
+        invoice_ids = [invoice1.pk, invoice2.pk, invoice3.pk]
+        with self.assertNumQueries(1):
+            due_by_invoice = Invoice.due_by_invoice(invoice_ids)
+        assert due_by_invoice == {invoice1.pk: invoice1.due(), invoice2.pk: invoice2.due(), invoice3.pk: Total()}
+        with self.assertNumQueries(1):
+            total_charges_by_invoice = Invoice.total_charges_by_invoice(invoice_ids)
+        assert total_charges_by_invoice[invoice1.pk] == Total(10, 'CHF')
+        assert total_charges_by_invoice[invoice2.pk] == Total(5, 'EUR')
+        assert total_charges_by_invoice[invoice3.pk] == Total()
+
 
 class CreditCardTest(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         user = User.objects.create_user('a-username')
-        self.account = Account.objects.create(owner=user, currency='CHF')
+        cls.account = Account.objects.create(owner=user, currency='CHF')
 
     def test_it_can_filter_valid_credit_cards(self):
         psp_credit_card1 = MyPSPCreditCard.objects.create(token='atoken1')
@@ -166,8 +196,9 @@ class CreditCardTest(TestCase):
 
 
 class AccountTest(TestCase):
-    def setUp(self):
-        self.user = User.objects.create_user('a-username')
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('a-username')
 
     def test_it_should_return_only_open_accounts(self):
         Account.objects.create(owner=self.user, currency='CHF')
@@ -178,22 +209,22 @@ class AccountTest(TestCase):
             assert len(open_accounts) == 1
 
     def test_it_should_filter_accounts_with_uninvoiced_positive_charges(self):
-        account1 = Account.objects.create(owner=self.user, currency='CHF')
-        invoice1 = Invoice.objects.create(account=account1, due_date=date.today())
-        Charge.objects.create(account=account1, amount=Money(10, 'CHF'), product_code='ACHARGE',
-                              invoice=invoice1)
-
         user2 = User.objects.create_user('a-username-2')
-        account2 = Account.objects.create(owner=user2, currency='CHF')
-        Charge.objects.create(account=account2, amount=Money(10, 'CHF'), product_code='ACHARGE')
-
         user3 = User.objects.create_user('a-username-3')
-        account3 = Account.objects.create(owner=user3, currency='EUR')
-        Charge.objects.create(account=account3, amount=Money(10, 'CHF'), product_code='ACHARGE', deleted=True)
-
         user4 = User.objects.create_user('a-username-4')
-        account4 = Account.objects.create(owner=user4, currency='EUR')
-        Charge.objects.create(account=account4, amount=Money(-10, 'CHF'), product_code='ACHARGE')
+        account1, account2, account3, account4 = Account.objects.bulk_create([
+            Account(owner=self.user, currency='CHF'),
+            Account(owner=user2, currency='CHF'),
+            Account(owner=user3, currency='EUR'),
+            Account(owner=user4, currency='EUR'),
+        ])
+        invoice1 = Invoice.objects.create(account=account1, due_date=date.today())
+        Charge.objects.bulk_create([
+            Charge(account=account1, amount=Money(10, 'CHF'), product_code='ACHARGE', invoice=invoice1),
+            Charge(account=account2, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=account3, amount=Money(10, 'CHF'), product_code='ACHARGE', deleted=True),
+            Charge(account=account4, amount=Money(-10, 'CHF'), product_code='ACHARGE'),
+        ])
 
         with self.assertNumQueries(1):
             open_with_uninvoiced = Account.objects.with_uninvoiced_positive_charges()
@@ -202,8 +233,10 @@ class AccountTest(TestCase):
 
     def test_uninvoiced_positive_charges_should_return_a_single_account_even_if_many_charges(self):
         account1 = Account.objects.create(owner=self.user, currency='CHF')
-        Charge.objects.create(account=account1, amount=Money(1, 'CHF'), product_code='BCHARGE')
-        Charge.objects.create(account=account1, amount=Money(10, 'CHF'), product_code='CCHARGE')
+        Charge.objects.bulk_create([
+            Charge(account=account1, amount=Money(1, 'CHF'), product_code='BCHARGE'),
+            Charge(account=account1, amount=Money(10, 'CHF'), product_code='CCHARGE'),
+        ])
 
         with self.assertNumQueries(1):
             open_with_uninvoiced = Account.objects.with_uninvoiced_positive_charges()
@@ -211,17 +244,20 @@ class AccountTest(TestCase):
             assert open_with_uninvoiced[0] == account1
 
     def test_should_filter_accounts_with_no_charges_since(self):
-        account1 = Account.objects.create(owner=self.user, currency='CHF')
+        user2 = User.objects.create_user('a-username-2')
+        user3 = User.objects.create_user('a-username-3')
+        account1, account2, account3 = Account.objects.bulk_create([
+            Account(owner=self.user, currency='CHF'),
+            Account(owner=user2, currency='CHF'),
+            Account(owner=user3, currency='CHF'),
+        ])
+
         old_charge_account1 = Charge.objects.create(account=account1, amount=Money(10, 'CHF'), product_code='ACHARGE')
         old_charge_account1.created = parse_datetime('2001-01-01T01:01:01Z')
         old_charge_account1.save()
 
-        user2 = User.objects.create_user('a-username-2')
-        account2 = Account.objects.create(owner=user2, currency='CHF')
         Charge.objects.create(account=account2, amount=Money(15, 'CHF'), product_code='BCHARGE')
 
-        user3 = User.objects.create_user('a-username-3')
-        account3 = Account.objects.create(owner=user3, currency='CHF')
         old_charge_account3 = Charge.objects.create(account=account3, amount=Money(10, 'CHF'), product_code='CCHARGE')
         old_charge_account3.created = parse_datetime('2001-01-01T01:01:01Z')
         old_charge_account3.save()
@@ -234,8 +270,10 @@ class AccountTest(TestCase):
 
     def test_no_charges_since_should_return_a_single_account_even_if_many_charges(self):
         account1 = Account.objects.create(owner=self.user, currency='CHF')
-        Charge.objects.create(account=account1, amount=Money(10, 'CHF'), product_code='CCHARGE')
-        Charge.objects.create(account=account1, amount=Money(10, 'CHF'), product_code='DCHARGE')
+        Charge.objects.bulk_create([
+            Charge(account=account1, amount=Money(10, 'CHF'), product_code='CCHARGE'),
+            Charge(account=account1, amount=Money(10, 'CHF'), product_code='DCHARGE'),
+        ])
 
         with self.assertNumQueries(1):
             accounts = Account.objects.with_no_charges_since(timezone.now() + timedelta(days=1))
@@ -244,13 +282,15 @@ class AccountTest(TestCase):
 
     def test_it_should_compute_the_account_balance(self):
         account = Account.objects.create(owner=self.user, currency='CHF')
-        Charge.objects.create(account=account, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=account, amount=Money(-3, 'CHF'), product_code='ACREDIT')
+        Charge.objects.bulk_create([
+            Charge(account=account, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=account, amount=Money(-3, 'CHF'), product_code='ACREDIT'),
+        ])
         psp_payment = MyPSPPayment(payment_ref='apaymentref')
         Transaction.objects.create(account=account, amount=Money(6, 'CHF'), success=True,
                                    payment_method='VIS', credit_card_number='4111 1111 1111 1111',
                                    psp_object=psp_payment)
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             assert account.balance() == Total(-1, 'CHF')
 
     def test_unsuccessful_transactions_should_not_impact_the_balance(self):
@@ -260,7 +300,7 @@ class AccountTest(TestCase):
         Transaction.objects.create(account=account, amount=Money(6, 'CHF'), success=False,
                                    payment_method='VIS', credit_card_number='4111 1111 1111 1111',
                                    psp_object=psp_payment)
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             assert account.balance() == Total(-10, 'CHF')
 
     def test_balance_as_of_date_should_ignore_more_recent_charges(self):
@@ -270,14 +310,16 @@ class AccountTest(TestCase):
         old_charge.created = parse_datetime('2015-01-01T00:00:00Z')
         old_charge.save()
         Charge.objects.create(account=account, amount=Money(10, 'CHF'), product_code='TODAY')
-        with self.assertNumQueries(2):
+        with self.assertNumQueries(1):
             assert account.balance(as_of=parse_datetime('2016-06-06T00:00:00Z')) == Total([Money(-5, 'CHF')])
 
     def test_it_should_compute_the_account_balance_in_multiple_currencies(self):
         account = Account.objects.create(owner=self.user, currency='CHF')
-        Charge.objects.create(account=account, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=account, amount=Money(-3, 'EUR'), product_code='ACREDIT')
-        with self.assertNumQueries(2):
+        Charge.objects.bulk_create([
+            Charge(account=account, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=account, amount=Money(-3, 'EUR'), product_code='ACREDIT'),
+        ])
+        with self.assertNumQueries(1):
             assert account.balance() == Total(-10, 'CHF', 3, 'EUR')
 
     def test_it_should_select_accounts_with_pending_invoices(self):
@@ -294,13 +336,16 @@ class AccountTest(TestCase):
 
 
 class ChargeTest(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         user = User.objects.create_user('a-username')
-        self.account = Account.objects.create(owner=user, currency='CHF')
+        cls.account = Account.objects.create(owner=user, currency='CHF')
 
     def test_in_currency(self):
-        Charge.objects.create(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=self.account, deleted=True, amount=Money(5, 'EUR'), product_code='BCHARGE')
+        Charge.objects.bulk_create([
+            Charge(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, deleted=True, amount=Money(5, 'EUR'), product_code='BCHARGE'),
+        ])
         with self.assertNumQueries(1):
             result = list(Charge.objects.in_currency(currency='CHF'))
             assert len(result) == 1
@@ -315,24 +360,30 @@ class ChargeTest(TestCase):
             assert total_amount(uc) == Total()
 
     def test_uninvoiced_should_consider_credits(self):
-        Charge.objects.create(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=self.account, amount=Money(-30, 'CHF'), product_code='ACREDIT')
+        Charge.objects.bulk_create([
+            Charge(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, amount=Money(-30, 'CHF'), product_code='ACREDIT'),
+        ])
         with self.assertNumQueries(2):
             uc = Charge.objects.uninvoiced(account_id=self.account.pk)
             assert len(uc) == 2
             assert total_amount(uc) == Total(-20, 'CHF')
 
     def test_uninvoiced_can_be_in_multiple_currencies(self):
-        Charge.objects.create(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=self.account, amount=Money(-30, 'EUR'), product_code='ACREDIT')
+        Charge.objects.bulk_create([
+            Charge(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, amount=Money(-30, 'EUR'), product_code='ACREDIT'),
+        ])
         with self.assertNumQueries(2):
             uc = Charge.objects.uninvoiced(account_id=self.account.pk)
             assert len(uc) == 2
             assert total_amount(uc) == Total(10, 'CHF', -30, 'EUR')
 
     def test_uninvoiced_should_ignore_deleted_charges(self):
-        Charge.objects.create(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE')
-        Charge.objects.create(account=self.account, deleted=True, amount=Money(5, 'CHF'), product_code='BCHARGE')
+        Charge.objects.bulk_create([
+            Charge(account=self.account, amount=Money(10, 'CHF'), product_code='ACHARGE'),
+            Charge(account=self.account, deleted=True, amount=Money(5, 'CHF'), product_code='BCHARGE'),
+        ])
         with self.assertNumQueries(2):
             uc = Charge.objects.uninvoiced(account_id=self.account.pk)
             assert len(uc) == 1
@@ -353,9 +404,11 @@ class ChargeTest(TestCase):
         charge.product_properties.create(name='color', value='blue')
         charge.full_clean()
         # Now read back from the db
-        retrieved = Charge.objects.all()[0]
-        assert retrieved.product_properties.count() == 1
-        assert retrieved.product_properties.all()[0].name == 'color'
+        with self.assertNumQueries(2):
+            retrieved = Charge.objects.prefetch_related('product_properties').first()
+            properties = list(retrieved.product_properties.all())
+        assert len(properties) == 1
+        assert properties[0].name == 'color'
 
     def test_it_can_mark_charge_as_deleted(self):
         Charge.objects.create(account=self.account, amount=Money(10, 'CHF'),
@@ -368,10 +421,11 @@ class ChargeTest(TestCase):
 
 
 class ProductPropertyTest(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         user = User.objects.create_user('a-username')
         account = Account.objects.create(owner=user, currency='CHF')
-        self.charge = Charge.objects.create(account=account, amount=Money(10, 'CHF'), product_code='ACHARGE')
+        cls.charge = Charge.objects.create(account=account, amount=Money(10, 'CHF'), product_code='ACHARGE')
 
     def test_it_can_set_product_properties(self):
         ProductProperty.objects.create(charge=self.charge, name='color', value='blue')
@@ -379,7 +433,7 @@ class ProductPropertyTest(TestCase):
 
     def test_it_cannot_redefine_a_property(self):
         ProductProperty.objects.create(charge=self.charge, name='color', value='blue')
-        with raises(IntegrityError):
+        with raises(IntegrityError), transaction.atomic():
             ProductProperty.objects.create(charge=self.charge, name='color', value='red')
 
     def test_it_cannot_use_an_empty_property_name(self):
@@ -393,7 +447,7 @@ class ProductPropertyTest(TestCase):
             p.full_clean()
 
     def test_property_value_cannot_be_none(self):
-        with raises(IntegrityError):
+        with raises(IntegrityError), transaction.atomic():
             ProductProperty.objects.create(charge=self.charge, name='color', value=None)
 
     def test_property_value_can_be_empty(self):
@@ -402,10 +456,11 @@ class ProductPropertyTest(TestCase):
 
 
 class SolventAccountsTest(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         user = User.objects.create_user('a-username')
-        self.account = Account.objects.create(owner=user, currency='CHF')
-        self.currency_threshold_price_map = {
+        cls.account = Account.objects.create(owner=user, currency='CHF')
+        cls.currency_threshold_price_map = {
             'CHF': Decimal(10.83),
             'EUR': Decimal(10.),
             'NOK': Decimal(103.97)
@@ -0,0 +1,39 @@
+import json
+from decimal import Decimal
+from unittest import TestCase, mock, skipUnless
+
+from django.utils.translation import gettext_lazy
+from pytest import raises
+
+from billing import renderers
+from billing.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTest(TestCase):
+    def test_it_should_render_like_the_drf_renderer(self):
+        data = {'amount': Decimal('15.00'), 'type': gettext_lazy('Charge'), 'items': [{'id': 1}], 'none': None}
+        rendered = FastJSONRenderer().render(data)
+        assert json.loads(rendered) == {'amount': '15.00', 'type': 'Charge', 'items': [{'id': 1}], 'none': None}
+
+    def test_it_should_render_nothing_for_no_data(self):
+        assert FastJSONRenderer().render(None) == b''
+
+
+@skipUnless(renderers.orjson, 'orjson is not installed')
+class FastJSONRendererWithOrjsonTest(TestCase):
+    def test_it_should_render_with_orjson(self):
+        data = {'amount': Decimal('15.00'), 'type': gettext_lazy('Charge')}
+        with mock.patch.object(renderers.orjson, 'dumps', wraps=renderers.orjson.dumps) as dumps:
+            rendered = FastJSONRenderer().render(data)
+        dumps.assert_called_once()
+        assert rendered == b'{"amount":"15.00","type":"Charge"}'
+
+    def test_it_should_fail_on_unknown_types(self):
+        with raises(TypeError):
+            FastJSONRenderer().render({'value': object()})
+
+    def test_it_should_fall_back_on_the_drf_renderer_when_indenting(self):
+        with mock.patch.object(renderers.orjson, 'dumps') as dumps:
+            rendered = FastJSONRenderer().render({'items': [1]}, renderer_context={'indent': 2})
+        dumps.assert_not_called()
+        assert rendered == b'{\n  "items": [\n    1\n  ]\n}'
@@ -113,6 +113,10 @@ class TotalTest(TestCase):
         assert t1.monies() == [Money(100, 'USD'), Money(0, 'EUR')]
         assert t1.nonzero_monies() == [Money(100, 'USD')]
 
+    def test_iter(self):
+        t1 = Total(100, 'USD', 0, 'EUR')
+        assert list(t1) == [Money(100, 'USD'), Money(0, 'EUR')]
+
 
 class TotalSerializerTest(TestCase):
     def test_serialize(self):
@@ -3,20 +3,26 @@ from django.test import TestCase
 from django.urls import reverse
 from django_fsm import TransitionNotAllowed
 from pytest import raises
-from rest_framework.status import HTTP_200_OK, HTTP_404_NOT_FOUND
+from rest_framework.status import HTTP_200_OK, HTTP_404_NOT_FOUND, HTTP_405_METHOD_NOT_ALLOWED
 from rest_framework.test import APIClient
 
 
 class AccountViewTest(TestCase):
     fixtures = ['tests/sample-data']
 
+    @classmethod
+    def setUpTestData(cls):
+        # force_authenticate doesn't touch the db, so the users can be shared by all the tests.
+        cls.user111 = User.objects.get(id=111)
+        cls.user222 = User.objects.get(id=222)
+        cls.account_url = reverse('billing_account')
+
     def test_it_should_retrieve_users_account(self):
-        user111 = User.objects.get(id=111)
         client = APIClient()
-        client.force_authenticate(user111)
+        client.force_authenticate(self.user111)
 
-        with self.assertNumQueries(14):
-            response = client.get(reverse('billing_account'))
+        with self.assertNumQueries(9):
+            response = client.get(self.account_url)
         assert response.status_code == HTTP_200_OK
         assert response.json() == {
             'id': '016e8ed0-8786-4ffc-b5e0-bf2b919c8d2b',
@@ -76,12 +82,11 @@ class AccountViewTest(TestCase):
         }
 
     def test_it_should_retrieve_charge_product_attributes(self):
-        user222 = User.objects.get(id=222)
         client = APIClient()
-        client.force_authenticate(user222)
+        client.force_authenticate(self.user222)
 
-        with self.assertNumQueries(11):
-            response = client.get(reverse('billing_account'))
+        with self.assertNumQueries(9):
+            response = client.get(self.account_url)
         assert response.status_code == HTTP_200_OK
         assert response.json()['charges'][0] == {
             'id': 'd98e1970-e9d9-4916-bfdf-6f59f12dbd88',
@@ -107,19 +112,26 @@ CREDIT_CARD_2_ID = '66a125e6-a710-4ae1-b2fc-0c3f17663e05'
 class CreditCardViewTest(TestCase):
     fixtures = ['tests/sample-data']
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user111 = User.objects.get(id=111)
+        cls.user222 = User.objects.get(id=222)
+        cls.credit_cards_url = reverse('billing_creditcard-list')
+        cls.credit_card_1_url = reverse('billing_creditcard-detail', args=[CREDIT_CARD_1_ID])
+
     def test_it_should_list_credit_cards(self):
         client = APIClient()
-        client.force_authenticate(User.objects.get(id=111))
+        client.force_authenticate(self.user111)
         with self.assertNumQueries(1):
-            response = client.get(reverse('billing_creditcard-list'))
+            response = client.get(self.credit_cards_url)
         assert response.status_code == HTTP_200_OK
         assert len(response.json()) == 1
 
     def test_it_should_retrieve_credit_card(self):
         client = APIClient()
-        client.force_authenticate(User.objects.get(id=111))
+        client.force_authenticate(self.user111)
         with self.assertNumQueries(1):
-            response = client.get(reverse('billing_creditcard-detail', args=[CREDIT_CARD_1_ID]))
+            response = client.get(self.credit_card_1_url)
         assert response.status_code == HTTP_200_OK
         assert response.json() == {
             'id': 'f4eda79e-ba6b-45d5-b0c4-7cd039229bae',
@@ -133,29 +145,36 @@ class CreditCardViewTest(TestCase):
             'expired': True,
         }
 
+    def test_it_should_not_allow_put(self):
+        client = APIClient()
+        client.force_authenticate(self.user111)
+        response = client.put(self.credit_card_1_url, {'status': 'INACTIVE'}, format='json')
+        assert response.status_code == HTTP_405_METHOD_NOT_ALLOWED
+        assert response['Allow'] == 'GET, PATCH'
+
     def test_it_should_prevent_retrieving_someone_elses_credit_card(self):
         client = APIClient()
-        client.force_authenticate(User.objects.get(id=222))
+        client.force_authenticate(self.user222)
         with self.assertNumQueries(1):
-            response = client.get(reverse('billing_creditcard-detail', args=[CREDIT_CARD_1_ID]))
+            response = client.get(self.credit_card_1_url)
         assert response.status_code == HTTP_404_NOT_FOUND
 
     def test_it_should_deactivate_a_credit_card(self):
         client = APIClient()
-        client.force_authenticate(User.objects.get(id=111))
+        client.force_authenticate(self.user111)
         response = client.patch(
-            reverse('billing_creditcard-detail', args=[CREDIT_CARD_1_ID]),
+            self.credit_card_1_url,
             {'status': 'INACTIVE'},
             format='json')
         assert response.status_code == HTTP_200_OK
 
     def test_it_should_prevent_activating_an_active_credit_card(self):
         client = APIClient()
-        client.force_authenticate(User.objects.get(id=111))
+        client.force_authenticate(self.user111)
 
         # I would have prefered returning a specific status code and asserting that.
         with raises(TransitionNotAllowed):
             client.patch(
-                reverse('billing_creditcard-detail', args=[CREDIT_CARD_1_ID]),
+                self.credit_card_1_url,
                 {'status': 'ACTIVE'},
                 format='json')